@@ -20,14 +20,21 @@ Options:
     --max-arrival-time N    Maximum arrival time for packages (default: 50)
     --output FILE           Output file (default: generated_input.json)
     --seed SEED             Random seed for reproducibility (default: None)
+    --pretty                Indent the output JSON (default: compact)
 
 Example:
     python generate_input.py --size 100 --packages 500 --output large_input.json
 """
 
 import json
-import random
+import os
+import sys
 import argparse
+import numpy as np
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from typing import Dict, List, Any, Tuple
 
 
@@ -61,8 +68,7 @@ def generate_input(
     Returns:
         Dictionary containing the generated input
     """
-    if seed is not None:
-        random.seed(seed)
+    rng = np.random.default_rng(seed)
     
     # Ensure we don't have too many locations for the grid size
     total_locations = num_warehouses + num_package_points + num_destinations
@@ -75,82 +81,77 @@ def generate_input(
         print(f"Warning: Too many locations for grid size. Scaled down to {num_warehouses} warehouses, "
               f"{num_package_points} package points, and {num_destinations} destinations.")
     
-    # Generate locations
-    locations = []
-    used_coordinates = set()
+    # Draw distinct grid cells for every location in one vectorized call
+    total_locations = num_warehouses + num_package_points + num_destinations
+    flat_indices = rng.choice(size * size, total_locations, replace=False)
+    xs, ys = np.divmod(flat_indices, size)
+    xs, ys = xs.tolist(), ys.tolist()
+    package_point_capacities = rng.integers(1, max_pp_capacity + 1, num_package_points).tolist()
+    
+    warehouse_ids = [f"W{i+1}" for i in range(num_warehouses)]
+    package_point_ids = [f"P{i+1}" for i in range(num_package_points)]
+    destination_ids = [f"D{i+1}" for i in range(num_destinations)]
+    
+    # Generate locations into a preallocated list, one slice per type
+    locations = [None] * total_locations
     
     # Generate warehouses
-    for i in range(num_warehouses):
-        while True:
-            x = random.randint(0, size - 1)
-            y = random.randint(0, size - 1)
-            if (x, y) not in used_coordinates:
-                used_coordinates.add((x, y))
-                locations.append({
-                    "id": f"W{i+1}",
-                    "type": "warehouse",
-                    "coordinates": [x, y]
-                })
-                break
+    for i, location_id in enumerate(warehouse_ids):
+        locations[i] = {
+            "id": location_id,
+            "type": "warehouse",
+            "coordinates": [xs[i], ys[i]]
+        }
     
     # Generate package points
-    for i in range(num_package_points):
-        while True:
-            x = random.randint(0, size - 1)
-            y = random.randint(0, size - 1)
-            if (x, y) not in used_coordinates:
-                used_coordinates.add((x, y))
-                capacity = random.randint(1, max_pp_capacity)
-                locations.append({
-                    "id": f"P{i+1}",
-                    "type": "package_point",
-                    "capacity": capacity,
-                    "coordinates": [x, y]
-                })
-                break
+    offset = num_warehouses
+    for i, (location_id, capacity) in enumerate(zip(package_point_ids, package_point_capacities), offset):
+        locations[i] = {
+            "id": location_id,
+            "type": "package_point",
+            "capacity": capacity,
+            "coordinates": [xs[i], ys[i]]
+        }
     
     # Generate destinations
-    for i in range(num_destinations):
-        while True:
-            x = random.randint(0, size - 1)
-            y = random.randint(0, size - 1)
-            if (x, y) not in used_coordinates:
-                used_coordinates.add((x, y))
-                locations.append({
-                    "id": f"D{i+1}",
-                    "type": "destination",
-                    "coordinates": [x, y]
-                })
-                break
+    offset += num_package_points
+    for i, location_id in enumerate(destination_ids, offset):
+        locations[i] = {
+            "id": location_id,
+            "type": "destination",
+            "coordinates": [xs[i], ys[i]]
+        }
     
     # Generate couriers
-    couriers = []
-    warehouse_ids = [loc["id"] for loc in locations if loc["type"] == "warehouse"]
-    
-    for i in range(num_couriers):
-        start_location = random.choice(warehouse_ids)
-        capacity = random.randint(1, max_courier_capacity)
-        couriers.append({
-            "id": f"C{i+1}",
-            "start_location": start_location,
+    courier_starts = rng.integers(0, len(warehouse_ids), num_couriers).tolist()
+    courier_capacities = rng.integers(1, max_courier_capacity + 1, num_couriers).tolist()
+    courier_ids = list(map("C{}".format, range(1, num_couriers + 1)))
+    
+    couriers = [
+        {
+            "id": courier_id,
+            "start_location": warehouse_ids[start],
             "capacity": capacity
-        })
+        }
+        for courier_id, start, capacity in zip(courier_ids, courier_starts, courier_capacities)
+    ]
     
     # Generate packages
-    packages = []
-    destination_ids = [loc["id"] for loc in locations if loc["type"] == "destination"]
+    # One (origin, destination, arrival_time) row per package, drawn in a single call
+    package_fields = rng.integers(
+        0, [len(warehouse_ids), len(destination_ids), max_arrival_time + 1], size=(num_packages, 3)
+    ).tolist()
+    package_ids = [f"PKG{i:03d}" for i in range(1, num_packages + 1)]
     
-    for i in range(num_packages):
-        origin = random.choice(warehouse_ids)
-        destination = random.choice(destination_ids)
-        arrival_time = random.randint(0, max_arrival_time)
-        
-        packages.append({
-            "id": f"P{i+1:03d}",
-            "origin": origin,
-            "destination": destination,
+    packages = [
+        {
+            "id": package_id,
+            "origin": warehouse_ids[origin],
+            "destination": destination_ids[destination],
             "arrival_time": arrival_time
-        })
+        }
+        for package_id, (origin, destination, arrival_time) in zip(package_ids, package_fields)
+    ]
     
     # Create the final input
     input_data = {
@@ -165,75 +166,164 @@ def generate_input(
     return input_data
 
 
-def save_input(input_data: Dict[str, Any], output_file: str):
+# Number of list items serialized per write when streaming the output file
+WRITE_CHUNK_SIZE = 1024
+
+
+def _dumps(value: Any, depth: int = 0, pretty: bool = False) -> bytes:
+    """
+    Serialize a value as JSON nested at the given depth.
+    
+    Args:
+        value: JSON-serializable value
+        depth: Nesting depth of the value inside the enclosing document
+        pretty: Use 2-space indentation instead of compact separators
+        
+    Returns:
+        Encoded JSON bytes
+    """
+    if not pretty:
+        if orjson is not None:
+            return orjson.dumps(value)
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode()
+    
+    if orjson is not None:
+        encoded = orjson.dumps(value, option=orjson.OPT_INDENT_2)
+    else:
+        encoded = json.dumps(value, indent=2).encode()
+    if depth:
+        encoded = encoded.replace(b"\n", b"\n" + b"  " * depth)
+    return encoded
+
+
+def _write_all(fd: int, data: bytes):
+    """
+    Write a whole buffer to a raw file descriptor, retrying on short writes.
+    
+    Args:
+        fd: Open file descriptor
+        data: Bytes to write
+    """
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def save_input(input_data: Dict[str, Any], output_file: str, pretty: bool = False):
     """
     Save the generated input to a JSON file.
     
+    Top-level fields are written one at a time and lists are streamed in
+    chunks, so the full document is never held in memory as one string.
+    Each chunk goes to the file descriptor in a single unbuffered write.
+    
     Args:
         input_data: Dictionary containing the input data
         output_file: Path to save the input file
+        pretty: Indent the JSON for readability instead of writing it compactly
     """
-    with open(output_file, 'w') as f:
-        json.dump(input_data, f, indent=2)
+    if pretty:
+        field_sep, item_sep, key_sep = b"\n  ", b"\n    ", b": "
+        list_end, document_end = b"\n  ]", b"\n}"
+    else:
+        field_sep, item_sep, key_sep = b"", b"", b":"
+        list_end, document_end = b"]", b"}"
+    
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(output_file, flags, 0o644)
+    try:
+        pending = [b"{"]
+        for i, (key, value) in enumerate(input_data.items()):
+            pending.append(b"," + field_sep if i else field_sep)
+            pending.append(_dumps(key) + key_sep)
+            
+            if not isinstance(value, list) or not value:
+                pending.append(_dumps(value, depth=1, pretty=pretty))
+                continue
+            
+            pending.append(b"[")
+            for start in range(0, len(value), WRITE_CHUNK_SIZE):
+                chunk = value[start:start + WRITE_CHUNK_SIZE]
+                pending.append(b"," + item_sep if start else item_sep)
+                pending.append((b"," + item_sep).join(_dumps(item, depth=2, pretty=pretty) for item in chunk))
+                _write_all(fd, b"".join(pending))
+                pending = []
+            pending.append(list_end)
+        pending.append(document_end)
+        _write_all(fd, b"".join(pending))
+    finally:
+        os.close(fd)
     print(f"Input saved to {output_file}")
 
 
-def print_statistics(input_data: Dict[str, Any]):
+def print_statistics(input_data: Dict[str, Any], max_listed: int = 100):
     """
     Print statistics about the generated input.
     
     Args:
         input_data: Dictionary containing the input data
+        max_listed: Maximum number of per-location counts to list in each
+            distribution section; larger sections are summarized instead
     """
     map_size = input_data["map"]["dimensions"]
     locations = input_data["map"]["locations"]
     couriers = input_data["couriers"]
     packages = input_data["packages"]
     
-    warehouses = [loc for loc in locations if loc["type"] == "warehouse"]
-    package_points = [loc for loc in locations if loc["type"] == "package_point"]
-    destinations = [loc for loc in locations if loc["type"] == "destination"]
-    
-    print("\nInput Statistics:")
-    print(f"Map Size: {map_size[0]}x{map_size[1]}")
-    print(f"Warehouses: {len(warehouses)}")
-    print(f"Package Points: {len(package_points)}")
-    print(f"Destinations: {len(destinations)}")
-    print(f"Couriers: {len(couriers)}")
-    print(f"Packages: {len(packages)}")
+    # Split locations by type in a single pass
+    warehouses, package_points, destinations = [], [], []
+    buckets = {"warehouse": warehouses, "package_point": package_points, "destination": destinations}
+    for loc in locations:
+        buckets[loc["type"]].append(loc)
     
     avg_courier_capacity = sum(c["capacity"] for c in couriers) / len(couriers)
     avg_pp_capacity = sum(p["capacity"] for p in package_points) / len(package_points)
     avg_arrival_time = sum(p["arrival_time"] for p in packages) / len(packages)
     
-    print(f"Average Courier Capacity: {avg_courier_capacity:.2f}")
-    print(f"Average Package Point Capacity: {avg_pp_capacity:.2f}")
-    print(f"Average Package Arrival Time: {avg_arrival_time:.2f}")
+    # Calculate package distribution over dense location indices
+    warehouse_ids = [loc["id"] for loc in warehouses]
+    destination_ids = [loc["id"] for loc in destinations]
+    warehouse_index = {location_id: i for i, location_id in enumerate(warehouse_ids)}
+    destination_index = {location_id: i for i, location_id in enumerate(destination_ids)}
     
-    # Calculate package distribution
-    packages_per_warehouse = {}
-    packages_per_destination = {}
+    origin_indices = np.fromiter((warehouse_index[p["origin"]] for p in packages),
+                                 dtype=np.int32, count=len(packages))
+    destination_indices = np.fromiter((destination_index[p["destination"]] for p in packages),
+                                      dtype=np.int32, count=len(packages))
     
-    for package in packages:
-        origin = package["origin"]
-        destination = package["destination"]
-        
-        if origin not in packages_per_warehouse:
-            packages_per_warehouse[origin] = 0
-        packages_per_warehouse[origin] += 1
-        
-        if destination not in packages_per_destination:
-            packages_per_destination[destination] = 0
-        packages_per_destination[destination] += 1
-    
-    print("\nPackage Distribution:")
-    print("Packages per Warehouse:")
-    for warehouse, count in packages_per_warehouse.items():
-        print(f"  {warehouse}: {count}")
-    
-    print("Packages per Destination:")
-    for destination, count in packages_per_destination.items():
-        print(f"  {destination}: {count}")
+    packages_per_warehouse = dict(zip(
+        warehouse_ids, np.bincount(origin_indices, minlength=len(warehouse_ids)).tolist()))
+    packages_per_destination = dict(zip(
+        destination_ids, np.bincount(destination_indices, minlength=len(destination_ids)).tolist()))
+    
+    # Collect every line first so the report goes out in a single write
+    lines = [
+        "",
+        "Input Statistics:",
+        f"Map Size: {map_size[0]}x{map_size[1]}",
+        f"Warehouses: {len(warehouses)}",
+        f"Package Points: {len(package_points)}",
+        f"Destinations: {len(destinations)}",
+        f"Couriers: {len(couriers)}",
+        f"Packages: {len(packages)}",
+        f"Average Courier Capacity: {avg_courier_capacity:.2f}",
+        f"Average Package Point Capacity: {avg_pp_capacity:.2f}",
+        f"Average Package Arrival Time: {avg_arrival_time:.2f}",
+        "",
+        "Package Distribution:",
+    ]
+    
+    for title, distribution in (("Packages per Warehouse:", packages_per_warehouse),
+                                ("Packages per Destination:", packages_per_destination)):
+        lines.append(title)
+        if len(distribution) > max_listed:
+            lines.append(f"  ({len(distribution)} locations, listing omitted)")
+            continue
+        lines.extend(f"  {location_id}: {count}" for location_id, count in distribution.items())
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 def main():
@@ -250,6 +340,7 @@ def main():
     parser.add_argument('--max-arrival-time', type=int, default=1000, help='Maximum arrival time for packages (default: 50)')
     parser.add_argument('--output', type=str, default='generated_input.json', help='Output file (default: generated_input.json)')
     parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducibility (default: None)')
+    parser.add_argument('--pretty', action='store_true', help='Indent the output JSON (default: compact)')
     parser.add_argument('--stats', action='store_true', help='Print statistics about the generated input')
     
     args = parser.parse_args()
@@ -267,7 +358,7 @@ def main():
         seed=args.seed
     )
     
-    save_input(input_data, args.output)
+    save_input(input_data, args.output, pretty=args.pretty)
     
     if args.stats:
         print_statistics(input_data)
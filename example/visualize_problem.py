@@ -21,13 +21,19 @@ Example:
 import json
 import sys
 import os
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import numpy as np
+from matplotlib.collections import LineCollection
 from matplotlib.lines import Line2D
 from typing import Dict, List, Any, Tuple
 
 
+# Small integer codes used to mask location arrays by type
+LOCATION_TYPE_CODES = {'warehouse': 0, 'package_point': 1, 'destination': 2}
+
+
 def load_problem_data(file_path: str) -> Dict[str, Any]:
     """
     Load problem data from a JSON file.
@@ -67,65 +73,67 @@ def get_location_by_id(data: Dict[str, Any], location_id: str) -> Dict[str, Any]
     return None
 
 
-def visualize_problem(data: Dict[str, Any], output_file: str = None):
+def visualize_problem(data: Dict[str, Any], output_file: str = None,
+                      max_labeled_packages: int = 200, max_labeled_couriers: int = 200):
     """
     Visualize the package delivery problem on a 2D grid map.
     
     Args:
         data: Dictionary containing the problem data
         output_file: Path to save the visualization (if None, display instead)
+        max_labeled_packages: Above this many packages, routes are drawn as
+            straight segments without ID and arrival-time labels
+        max_labeled_couriers: Above this many couriers, courier labels are omitted
     """
     # Get map dimensions
     map_width, map_height = data['map']['dimensions']
     
+    # Index locations by ID once so lookups below are O(1)
+    id_map = {location['id']: location for location in data['map']['locations']}
+    
     # Create figure
-    plt.figure(figsize=(12, 10))
+    fig, ax = plt.subplots(figsize=(12, 10))
     
-    # Create grid
-    plt.xlim(-0.5, map_width - 0.5)
-    plt.ylim(-0.5, map_height - 0.5)
-    plt.grid(True, linestyle='--', alpha=0.7)
+    # Create grid with fixed limits so bulk plotting never triggers autoscaling
+    ax.set_autoscale_on(False)
+    ax.set_xlim(-0.5, map_width - 0.5)
+    ax.set_ylim(-0.5, map_height - 0.5)
+    ax.grid(True, linestyle='--', alpha=0.7)
     
     # Plot locations
-    warehouse_xs, warehouse_ys = [], []
-    package_point_xs, package_point_ys = [], []
-    destination_xs, destination_ys = [], []
-    package_point_capacities = []
-    location_coords = {}
+    locations = data['map']['locations']
+    location_xy = np.array([location['coordinates'] for location in locations], dtype=float).reshape(-1, 2)
+    location_types = np.array([LOCATION_TYPE_CODES.get(location['type'], -1) for location in locations],
+                              dtype=np.int8)
+    location_capacities = np.array([location.get('capacity', 0) for location in locations])
     
-    for location in data['map']['locations']:
+    warehouse_mask = location_types == LOCATION_TYPE_CODES['warehouse']
+    package_point_mask = location_types == LOCATION_TYPE_CODES['package_point']
+    destination_mask = location_types == LOCATION_TYPE_CODES['destination']
+    
+    for location in locations:
         x, y = location['coordinates']
-        location_coords[location['id']] = (x, y)
-        
-        if location['type'] == 'warehouse':
-            warehouse_xs.append(x)
-            warehouse_ys.append(y)
-            plt.text(x, y + 0.3, location['id'], fontsize=10, ha='center')
-        elif location['type'] == 'package_point':
-            package_point_xs.append(x)
-            package_point_ys.append(y)
-            package_point_capacities.append(location['capacity'])
-            plt.text(x, y + 0.3, f"{location['id']} (Cap: {location['capacity']})", fontsize=10, ha='center')
-        elif location['type'] == 'destination':
-            destination_xs.append(x)
-            destination_ys.append(y)
-            plt.text(x, y + 0.3, location['id'], fontsize=10, ha='center')
+        if location['type'] == 'package_point':
+            ax.text(x, y + 0.3, f"{location['id']} (Cap: {location['capacity']})", fontsize=10, ha='center')
+        else:
+            ax.text(x, y + 0.3, location['id'], fontsize=10, ha='center')
     
     # Plot warehouses (blue squares)
-    plt.scatter(warehouse_xs, warehouse_ys, color='skyblue', s=200, marker='s', edgecolors='black', zorder=10, label='Warehouse')
+    ax.scatter(location_xy[warehouse_mask, 0], location_xy[warehouse_mask, 1], color='skyblue', s=200, marker='s', edgecolors='black', zorder=10, label='Warehouse')
     
     # Plot package points (green circles with size based on capacity)
-    sizes = [100 + cap * 30 for cap in package_point_capacities]
-    plt.scatter(package_point_xs, package_point_ys, color='lightgreen', s=sizes, edgecolors='black', zorder=10, label='Package Point')
+    sizes = 100 + 30 * location_capacities[package_point_mask]
+    ax.scatter(location_xy[package_point_mask, 0], location_xy[package_point_mask, 1], color='lightgreen', s=sizes, edgecolors='black', zorder=10, label='Package Point')
     
     # Plot destinations (red triangles)
-    plt.scatter(destination_xs, destination_ys, color='salmon', s=200, marker='^', edgecolors='black', zorder=10, label='Destination')
+    ax.scatter(location_xy[destination_mask, 0], location_xy[destination_mask, 1], color='salmon', s=200, marker='^', edgecolors='black', zorder=10, label='Destination')
     
     # Plot couriers
+    label_couriers = len(data['couriers']) <= max_labeled_couriers
     courier_positions = {}
     for i, courier in enumerate(data['couriers']):
         start_location_id = courier['start_location']
-        start_location = get_location_by_id(data, start_location_id)
+        start_location = id_map.get(start_location_id)
         
         if start_location:
             x, y = start_location['coordinates']
@@ -137,51 +145,61 @@ def visualize_problem(data: Dict[str, Any], output_file: str = None):
             courier_pos = (x + offset_x, y + offset_y)
             courier_positions[courier['id']] = courier_pos
             
-            plt.scatter(*courier_pos, color='purple', s=150, marker='s', edgecolors='black', zorder=15)
-            plt.text(courier_pos[0], courier_pos[1] + 0.2, courier['id'], fontsize=8, ha='center')
-            plt.text(courier_pos[0], courier_pos[1] - 0.2, f"Cap: {courier['capacity']}", fontsize=7, ha='center')
+            if label_couriers:
+                ax.text(courier_pos[0], courier_pos[1] + 0.2, courier['id'], fontsize=8, ha='center')
+                ax.text(courier_pos[0], courier_pos[1] - 0.2, f"Cap: {courier['capacity']}", fontsize=7, ha='center')
+    
+    # Draw all couriers with a single scatter call
+    if courier_positions:
+        courier_xs, courier_ys = zip(*courier_positions.values())
+        ax.scatter(courier_xs, courier_ys, color='purple', s=150, marker='s', edgecolors='black', zorder=15)
     
     # Plot packages as paths from origin to destination
+    routed_packages = []
+    curve_indices = []
+    origins_xy, dests_xy = [], []
     for i, package in enumerate(data['packages']):
-        origin_id = package['origin']
-        destination_id = package['destination']
-        
-        origin_location = get_location_by_id(data, origin_id)
-        destination_location = get_location_by_id(data, destination_id)
+        origin_location = id_map.get(package['origin'])
+        destination_location = id_map.get(package['destination'])
         
         if origin_location and destination_location:
-            origin_x, origin_y = origin_location['coordinates']
-            dest_x, dest_y = destination_location['coordinates']
-            
-            # Calculate path with slight curve
-            dx = dest_x - origin_x
-            dy = dest_y - origin_y
-            
-            # Number of points in the path
-            num_points = 20
-            
-            # Create a curved path
-            t = np.linspace(0, 1, num_points)
-            
-            # Add some curvature
-            curve_height = 0.5 + (i * 0.1)  # Different curve for each package
-            
-            # Parametric curve
-            x = origin_x + dx * t
-            y = origin_y + dy * t + curve_height * np.sin(np.pi * t)
-            
-            # Draw the path as a dashed line
-            plt.plot(x, y, 'r--', alpha=0.4, linewidth=1)
-            
-            # Add package label at the midpoint
-            mid_idx = num_points // 2
-            mid_x, mid_y = x[mid_idx], y[mid_idx]
-            
-            plt.text(mid_x, mid_y, package['id'], fontsize=7, ha='center', va='center',
+            routed_packages.append(package)
+            curve_indices.append(i)
+            origins_xy.append(origin_location['coordinates'])
+            dests_xy.append(destination_location['coordinates'])
+    
+    if len(routed_packages) > max_labeled_packages:
+        # Too dense for curves and labels to be readable: straight routes only
+        segments = np.stack([np.array(origins_xy, dtype=float), np.array(dests_xy, dtype=float)], axis=1)
+        ax.add_collection(LineCollection(segments, colors='r', linestyles='--', alpha=0.4, linewidths=1))
+    elif routed_packages:
+        origins_xy = np.array(origins_xy, dtype=float)
+        dests_xy = np.array(dests_xy, dtype=float)
+        deltas = dests_xy - origins_xy
+        
+        # Number of points in each path
+        num_points = 20
+        t = np.linspace(0, 1, num_points)
+        sin_term = np.sin(np.pi * t)  # Shared curve profile for every path
+        
+        # Add some curvature, different for each package
+        curve_heights = 0.5 + 0.1 * np.array(curve_indices, dtype=float)
+        
+        # Parametric curves, one row per package
+        xs = origins_xy[:, 0:1] + deltas[:, 0:1] * t
+        ys = origins_xy[:, 1:2] + deltas[:, 1:2] * t + curve_heights[:, None] * sin_term
+        
+        # Draw every path as a dashed line in one collection
+        segments = np.stack([xs, ys], axis=-1)
+        routes = LineCollection(segments, colors='r', linestyles='--', alpha=0.4, linewidths=1)
+        ax.add_collection(routes)
+        
+        # Add package labels and arrival times at the midpoints
+        mid_idx = num_points // 2
+        for package, mid_x, mid_y in zip(routed_packages, xs[:, mid_idx], ys[:, mid_idx]):
+            ax.text(mid_x, mid_y, package['id'], fontsize=7, ha='center', va='center',
                     bbox=dict(facecolor='yellow', alpha=0.7, edgecolor='none'))
-            
-            # Add arrival time
-            plt.text(mid_x, mid_y - 0.3, f"Arrival: {package['arrival_time']}", fontsize=6, ha='center',
+            ax.text(mid_x, mid_y - 0.3, f"Arrival: {package['arrival_time']}", fontsize=6, ha='center',
                     bbox=dict(facecolor='white', alpha=0.7, edgecolor='none'))
     
     # Create legend
@@ -192,23 +210,24 @@ def visualize_problem(data: Dict[str, Any], output_file: str = None):
         Line2D([0], [0], marker='s', color='w', markerfacecolor='purple', markersize=10, label='Courier'),
         Line2D([0], [0], linestyle='--', color='r', label='Package Route')
     ]
-    plt.legend(handles=legend_elements, loc='upper right')
+    ax.legend(handles=legend_elements, loc='upper right')
     
     # Set title and labels
-    plt.title('Package Delivery Problem Visualization')
-    plt.xlabel('X Coordinate')
-    plt.ylabel('Y Coordinate')
+    ax.set_title('Package Delivery Problem Visualization')
+    ax.set_xlabel('X Coordinate')
+    ax.set_ylabel('Y Coordinate')
     
     # Set integer ticks
-    plt.xticks(range(map_width))
-    plt.yticks(range(map_height))
+    ax.set_xticks(range(map_width))
+    ax.set_yticks(range(map_height))
     
     # Save or display
     if output_file:
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        fig.savefig(output_file, dpi=300, bbox_inches='tight')
+        plt.close(fig)
         print(f"Visualization saved to {output_file}")
     else:
-        plt.tight_layout()
+        fig.tight_layout()
         plt.show()
 
 
@@ -221,6 +240,10 @@ def main():
     input_file = sys.argv[1]
     output_file = sys.argv[2] if len(sys.argv) > 2 else None
     
+    # Render off-screen when only writing an image file
+    if output_file:
+        matplotlib.use('Agg')
+    
     data = load_problem_data(input_file)
     visualize_problem(data, output_file)
 
@@ -6,30 +6,72 @@ This script visualizes the solution (output) for the Package Delivery Algorithm
 It creates an animated visualization showing the movement of couriers and packages over time.
 
 Usage:
-    python visualize_solution.py <input_file.json> <output_file.json> [--save animation.gif]
+    python visualize_solution.py <input_file.json> <output_file.json> [--save animation.gif] [--workers N]
+                                                                     [--frame-step N] [--skip-idle]
 
 Requirements:
     - matplotlib
     - numpy
     - json
+    - orjson (optional, for faster loading of large files)
+    - ffmpeg (optional, for saving videos such as .mp4 instead of .gif)
 
 Example:
     python visualize_solution.py sample_input.json sample_output.json
     python visualize_solution.py sample_input.json sample_output.json --save solution.gif
+    python visualize_solution.py sample_input.json sample_output.json --save solution.mp4
 """
 
 import json
 import sys
 import os
+import subprocess
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import matplotlib.animation as animation
+import matplotlib.colors as mcolors
 import numpy as np
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from matplotlib.lines import Line2D
-from typing import Dict, List, Any, Tuple
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from typing import Dict, List, Any
 import argparse
 
 
+# Figure size (inches) and resolution, giving 640x520 pixel frames
+FIGURE_SIZE = (8, 6.5)
+FIGURE_DPI = 80
+
+# Integer codes for the location types
+LOCATION_TYPE_CODES = {'warehouse': 0, 'package_point': 1, 'destination': 2}
+
+# Integer codes for the courier actions and package statuses stored in the timeline
+ACTION_CODES = {'wait': 0, 'move': 1, 'pick_up': 2, 'drop_off': 3, 'deliver': 4}
+PACKAGE_STATUS_CODES = {'not_arrived': 0, 'at_warehouse': 1, 'with_courier': 2, 'at_package_point': 3, 'delivered': 4}
+
+# Package status resulting from each package-handling action
+PACKAGE_STATUS_AFTER_ACTION = {'pick_up': 'with_courier', 'drop_off': 'at_package_point', 'deliver': 'delivered'}
+PACKAGE_STATUS_AFTER_CODE = {ACTION_CODES[action]: PACKAGE_STATUS_CODES[status]
+                             for action, status in PACKAGE_STATUS_AFTER_ACTION.items()}
+
+# Courier marker colors by current action (moving/waiting couriers are purple)
+COURIER_ACTION_COLORS = {'pick_up': 'green', 'drop_off': 'orange', 'deliver': 'red'}
+
+# Package marker colors by status (anything else is yellow)
+PACKAGE_STATUS_COLORS = {'at_warehouse': 'blue', 'at_package_point': 'green'}
+
+# RGBA lookup tables indexed by the integer codes above
+COURIER_ACTION_RGBA = mcolors.to_rgba_array([COURIER_ACTION_COLORS.get(action, 'purple') for action in ACTION_CODES])
+PACKAGE_STATUS_RGBA = mcolors.to_rgba_array([PACKAGE_STATUS_COLORS.get(status, 'yellow') for status in PACKAGE_STATUS_CODES])
+
+
 def load_json_data(file_path: str) -> Dict[str, Any]:
     """
     Load data from a JSON file.
@@ -41,8 +83,9 @@ def load_json_data(file_path: str) -> Dict[str, Any]:
         Dictionary containing the data
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         return data
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
@@ -52,145 +95,444 @@ def load_json_data(file_path: str) -> Dict[str, Any]:
         sys.exit(1)
 
 
-def get_location_by_id(input_data: Dict[str, Any], location_id: str) -> Dict[str, Any]:
+def precompute_timeline(input_data: Dict[str, Any], output_data: List[Dict[str, Any]], max_time: int,
+                        coords_by_id: Dict[str, np.ndarray], times: np.ndarray) -> Dict[str, Any]:
     """
-    Get location details by ID.
+    Replay the solution once and record the state of every courier and package at each time.
     
     Args:
         input_data: Dictionary containing the problem data
-        location_id: ID of the location to find
+        output_data: List of actions from the solution
+        max_time: Number of time steps to record
+        coords_by_id: Coordinates of every location keyed by location ID
+        times: Time of each action in output_data
         
     Returns:
-        Dictionary containing location details
+        Dictionary with the courier and package IDs and per-time arrays indexed as
+        [time, entity]: courier_xy, courier_action, courier_packages, package_xy,
+        package_status and package_carrier (courier index, or -1 when not carried),
+        plus state_id, which only changes between times whose states differ
     """
-    for location in input_data['map']['locations']:
-        if location['id'] == location_id:
-            return location
-    return None
+    # Couriers start at their starting locations
+    start_coords = {}
+    for courier in input_data['couriers']:
+        coords = coords_by_id.get(courier['start_location'])
+        if coords is not None:
+            start_coords[courier['id']] = coords
+    courier_ids = list(start_coords)
+    courier_index = {courier_id: i for i, courier_id in enumerate(courier_ids)}
+    start_xy = np.reshape([start_coords[courier_id] for courier_id in courier_ids], (-1, 2)).astype(np.float32)
+    
+    packages = input_data['packages']
+    package_ids = [package['id'] for package in packages]
+    package_index = {package_id: i for i, package_id in enumerate(package_ids)}
+    arrival_times = np.array([package['arrival_time'] for package in packages], dtype=np.int64)
+    origin_xy = np.reshape([coords_by_id[package['origin']] for package in packages], (-1, 2)).astype(np.float32)
+    
+    num_couriers, num_packages = len(courier_ids), len(packages)
+    timeline = {
+        'courier_ids': courier_ids,
+        'package_ids': package_ids,
+        'package_xy': np.empty((max_time, num_packages, 2), dtype=np.float32),
+        'package_status': np.empty((max_time, num_packages), dtype=np.int8),
+        'package_carrier': np.empty((max_time, num_packages), dtype=np.int32),
+    }
+    
+    # Stable sort, so actions at the same time keep their order in the solution
+    order = np.argsort(times, kind='stable')
+    sorted_actions = [output_data[i] for i in order]
+    sorted_times = np.clip(times[order], 0, None)
+    
+    # Encode the actions as parallel arrays; actions by unknown couriers or at
+    # unknown locations stay at courier -1 and are ignored
+    num_actions = len(sorted_actions)
+    action_courier = np.full(num_actions, -1, dtype=np.int32)
+    action_code = np.zeros(num_actions, dtype=np.int8)
+    action_xy = np.zeros((num_actions, 2), dtype=np.float32)
+    action_packages = np.empty(num_actions, dtype=object)
+    for k, action in enumerate(sorted_actions):
+        if action['action'] == 'move':
+            coords = action['to']
+        elif action['action'] in ['pick_up', 'drop_off', 'deliver', 'wait']:
+            # For non-move actions, get the coordinates from the location
+            coords = coords_by_id.get(action['location'])
+            if coords is None:
+                continue
+        else:
+            continue
+        
+        courier = courier_index.get(action['courier'])
+        if courier is None:
+            continue
+        action_courier[k] = courier
+        action_code[k] = ACTION_CODES[action['action']]
+        action_xy[k] = coords
+        action_packages[k] = ', '.join(action['packages'])
+    
+    # Intern the packages handled by each action as indices, laid out back to back
+    # with action k's packages at package_offsets[k]:package_offsets[k + 1]
+    # (-1 for IDs not in the problem); ignored actions handle no packages
+    packages_by_action = [action.get('packages', ()) if courier >= 0 else ()
+                          for action, courier in zip(sorted_actions, action_courier)]
+    package_offsets = np.zeros(num_actions + 1, dtype=np.int64)
+    np.cumsum([len(packages) for packages in packages_by_action], out=package_offsets[1:])
+    action_package_index = np.fromiter(
+        (package_index.get(package_id, -1) for packages in packages_by_action for package_id in packages),
+        dtype=np.int32, count=package_offsets[-1])
+    
+    valid = np.flatnonzero((action_courier >= 0) & (sorted_times < max_time))
+    valid_times = sorted_times[valid]
+    
+    # Each courier shows its latest action up to and including each time
+    last_action = np.full((max_time, num_couriers), -1, dtype=np.int64)
+    np.maximum.at(last_action, (valid_times, action_courier[valid]), valid)
+    last_action = np.maximum.accumulate(last_action, axis=0)
+    has_acted = last_action >= 0
+    timeline['courier_xy'] = np.where(has_acted[..., None], action_xy[last_action], start_xy)
+    timeline['courier_action'] = np.where(has_acted, action_code[last_action], np.int8(ACTION_CODES['wait']))
+    timeline['courier_packages'] = np.where(has_acted, action_packages[last_action], '')
+    
+    # Packages are replayed forward, one batch of actions per time; their state is
+    # only tracked once an action touches them
+    touched = np.zeros(num_packages, dtype=bool)
+    current_status = np.zeros(num_packages, dtype=np.int8)
+    current_xy = np.zeros((num_packages, 2), dtype=np.float32)
+    current_carrier = np.full(num_packages, -1, dtype=np.int32)
+    action_ends = np.searchsorted(valid_times, np.arange(max_time), side='right')
+    cursor = 0
+    
+    for time in range(max_time):
+        # Apply every action up to and including this time
+        for k in valid[cursor:action_ends[time]]:
+            handled = action_package_index[package_offsets[k]:package_offsets[k + 1]]
+            handled = handled[handled >= 0]
+            courier = action_courier[k]
+            
+            if action_code[k] == ACTION_CODES['move']:
+                # Carried packages travel with the courier
+                carried = handled[touched[handled] & (current_carrier[handled] == courier)]
+                current_xy[carried] = action_xy[k]
+            elif action_code[k] in PACKAGE_STATUS_AFTER_CODE:
+                new_status = PACKAGE_STATUS_AFTER_CODE[action_code[k]]
+                touched[handled] = True
+                current_status[handled] = new_status
+                current_xy[handled] = action_xy[k]
+                current_carrier[handled] = courier if new_status == PACKAGE_STATUS_CODES['with_courier'] else -1
+        cursor = action_ends[time]
+        
+        # Record the snapshot for this time; untouched packages wait at their
+        # origin once they have arrived
+        arrived = arrival_times <= time
+        timeline['package_status'][time] = np.where(
+            touched, current_status,
+            np.where(arrived, PACKAGE_STATUS_CODES['at_warehouse'], PACKAGE_STATUS_CODES['not_arrived']))
+        timeline['package_xy'][time] = np.where(
+            touched[:, None], current_xy, np.where(arrived[:, None], origin_xy, np.nan))
+        timeline['package_carrier'][time] = np.where(touched, current_carrier, -1)
+    
+    timeline['state_id'] = _state_ids(timeline)
+    return timeline
 
 
-def get_courier_positions(input_data: Dict[str, Any], output_data: List[Dict[str, Any]], time: int) -> Dict[str, Tuple]:
+def _state_ids(timeline: Dict[str, Any]) -> np.ndarray:
+    """Number the distinct consecutive states so that equal IDs mark times with an identical picture."""
+    changed = np.zeros(len(timeline['courier_xy']), dtype=bool)
+    for key in ['courier_xy', 'courier_action', 'courier_packages', 'package_xy', 'package_status', 'package_carrier']:
+        current, previous = timeline[key][1:], timeline[key][:-1]
+        differs = current != previous
+        if key == 'package_xy':
+            differs &= ~(np.isnan(current) & np.isnan(previous))
+        changed[1:] |= differs.any(axis=tuple(range(1, differs.ndim)))
+    return np.cumsum(changed)
+
+
+def init_plot(ax, input_data: Dict[str, Any], courier_ids: List[str], package_ids: List[str],
+              animated: bool = True) -> Dict[str, Any]:
     """
-    Get positions of all couriers at a specific time.
+    Draw the static parts of the map and create the artists updated every frame.
     
     Args:
+        ax: Matplotlib axis to draw on
         input_data: Dictionary containing the problem data
-        output_data: List of actions from the solution
-        time: The time slice to get positions for
+        courier_ids: IDs of the couriers to label, in timeline order
+        package_ids: IDs of the packages to label, in timeline order
+        animated: Whether the dynamic artists are left out of full redraws for blitting
         
     Returns:
-        Dictionary mapping courier IDs to (x, y) positions and packages carried
+        Dictionary mapping names to the dynamic artists
     """
-    # Initialize courier positions with their starting locations
-    courier_positions = {}
-    for courier in input_data['couriers']:
-        start_location = get_location_by_id(input_data, courier['start_location'])
-        if start_location:
-            courier_positions[courier['id']] = {
-                'position': start_location['coordinates'],
-                'packages': [],
-                'action': 'wait',
-                'location_id': courier['start_location']
-            }
-    
-    # Update positions based on actions up to the given time
-    for action in output_data:
-        if action['time'] > time:
-            break
-            
-        courier_id = action['courier']
+    # Get map dimensions
+    map_width, map_height = input_data['map']['dimensions']
+    
+    # Set up the grid
+    ax.set_xlim(-0.5, map_width - 0.5)
+    ax.set_ylim(-0.5, map_height - 0.5)
+    ax.grid(True, linestyle='--', alpha=0.7)
+    
+    # Set integer ticks
+    ax.set_xticks(range(map_width))
+    ax.set_yticks(range(map_height))
+    
+    # Plot locations
+    locations = input_data['map']['locations']
+    location_xy = np.array([location['coordinates'] for location in locations], dtype=float).reshape(-1, 2)
+    location_types = np.array([LOCATION_TYPE_CODES.get(location['type'], -1) for location in locations],
+                              dtype=np.int8)
+    location_capacities = np.array([location.get('capacity', 0) for location in locations])
+    
+    warehouse_mask = location_types == LOCATION_TYPE_CODES['warehouse']
+    package_point_mask = location_types == LOCATION_TYPE_CODES['package_point']
+    destination_mask = location_types == LOCATION_TYPE_CODES['destination']
+    
+    for location, (x, y), type_code in zip(locations, location_xy, location_types):
+        if type_code == LOCATION_TYPE_CODES['package_point']:
+            ax.text(x, y + 0.3, f"{location['id']} (Cap: {location['capacity']})", fontsize=8, ha='center')
+        elif type_code >= 0:
+            ax.text(x, y + 0.3, location['id'], fontsize=8, ha='center')
+    
+    # Plot warehouses (blue squares)
+    ax.scatter(location_xy[warehouse_mask, 0], location_xy[warehouse_mask, 1], color='skyblue', s=200, marker='s', edgecolors='black', zorder=10)
+    
+    # Plot package points (green circles with size based on capacity)
+    sizes = 100 + 30 * location_capacities[package_point_mask]
+    ax.scatter(location_xy[package_point_mask, 0], location_xy[package_point_mask, 1], color='lightgreen', s=sizes, edgecolors='black', zorder=10)
+    
+    # Plot destinations (red triangles)
+    ax.scatter(location_xy[destination_mask, 0], location_xy[destination_mask, 1], color='salmon', s=200, marker='^', edgecolors='black', zorder=10)
+    
+    # Add legend
+    legend_elements = [
+        mpatches.Patch(color='skyblue', label='Warehouse'),
+        mpatches.Patch(color='lightgreen', label='Package Point'),
+        mpatches.Patch(color='salmon', label='Destination'),
+        Line2D([0], [0], marker='s', color='w', markerfacecolor='purple', markersize=10, label='Courier (Moving/Waiting)'),
+        Line2D([0], [0], marker='s', color='w', markerfacecolor='green', markersize=10, label='Courier (Picking Up)'),
+        Line2D([0], [0], marker='s', color='w', markerfacecolor='orange', markersize=10, label='Courier (Dropping Off)'),
+        Line2D([0], [0], marker='s', color='w', markerfacecolor='red', markersize=10, label='Courier (Delivering)'),
+        Line2D([0], [0], marker='o', color='w', markerfacecolor='blue', markersize=8, label='Package at Warehouse'),
+        Line2D([0], [0], marker='o', color='w', markerfacecolor='green', markersize=8, label='Package at Package Point')
+    ]
+    ax.legend(handles=legend_elements, loc='upper right', fontsize='small')
+    ax.set_title('Package Delivery Solution')
+    
+    # Dynamic artists: one collection per entity group plus one label per entity,
+    # created with its text so frames only move and show or hide it
+    def make_labels(texts, **kwargs):
+        return [ax.text(0, 0, text, visible=False, animated=animated, **kwargs) for text in texts]
+    
+    return {
+        'couriers': ax.scatter([], [], s=150, marker='s', edgecolors='black', zorder=15, animated=animated),
+        'packages': ax.scatter([], [], s=80, marker='o', edgecolors='black', alpha=0.7, zorder=12, animated=animated),
+        'courier_labels': make_labels(courier_ids, fontsize=8, ha='center'),
+        'courier_package_labels': make_labels([''] * len(courier_ids), fontsize=7, ha='center',
+                                              bbox=dict(facecolor='white', alpha=0.7, edgecolor='none')),
+        'package_labels': make_labels(package_ids, fontsize=6, ha='center', va='center'),
+        'time': ax.text(0.02, 0.98, '', transform=ax.transAxes, fontsize=12, va='top', animated=animated),
+        'delivered': ax.text(0.02, 0.02, '', transform=ax.transAxes, fontsize=12, animated=animated,
+                             bbox=dict(facecolor='white', alpha=0.7, edgecolor='black')),
+    }
+
+
+def select_frames(timeline: Dict[str, Any], max_time: int, frame_step: int = 1, skip_idle: bool = False) -> List[int]:
+    """
+    Choose the times to render.
+    
+    Args:
+        timeline: Per-time state returned by precompute_timeline
+        max_time: Number of recorded time steps
+        frame_step: Render only every frame_step-th time
+        skip_idle: Drop times at which no courier or package changed since the previous rendered frame
         
-        if action['action'] == 'move':
-            courier_positions[courier_id]['position'] = action['to']
-            courier_positions[courier_id]['packages'] = action['packages']
-            courier_positions[courier_id]['action'] = 'move'
-            courier_positions[courier_id]['location_id'] = None
-        elif action['action'] in ['pick_up', 'drop_off', 'deliver', 'wait']:
-            # For non-move actions, get the coordinates from the location
-            location = get_location_by_id(input_data, action['location'])
-            if location:
-                courier_positions[courier_id]['position'] = location['coordinates']
-                courier_positions[courier_id]['packages'] = action['packages']
-                courier_positions[courier_id]['action'] = action['action']
-                courier_positions[courier_id]['location_id'] = action['location']
+    Returns:
+        List of times to render, in order
+    """
+    times = list(range(0, max_time, frame_step))
+    if not skip_idle:
+        return times
     
-    return courier_positions
+    state_id = timeline['state_id']
+    frames = times[:1]
+    for time in times[1:]:
+        if state_id[time] != state_id[frames[-1]]:
+            frames.append(time)
+    return frames
 
 
-def get_package_status(input_data: Dict[str, Any], output_data: List[Dict[str, Any]], time: int) -> Dict[str, Dict]:
+def make_updater(artists: Dict[str, Any], timeline: Dict[str, Any]):
     """
-    Get the status of all packages at a specific time.
+    Create the per-frame update function for the given artists and timeline.
     
     Args:
-        input_data: Dictionary containing the problem data
-        output_data: List of actions from the solution
-        time: The time slice to get statuses for
+        artists: Dynamic artists returned by init_plot
+        timeline: Per-time state returned by precompute_timeline
         
     Returns:
-        Dictionary mapping package IDs to their status information
+        Function moving the dynamic artists to the state recorded for a given time
+        and returning them
     """
-    # Initialize package statuses
-    package_status = {}
-    for package in input_data['packages']:
-        # Check if package has arrived at warehouse
-        if package['arrival_time'] <= time:
-            package_status[package['id']] = {
-                'status': 'at_warehouse',
-                'location': package['origin'],
-                'position': get_location_by_id(input_data, package['origin'])['coordinates'],
-                'carrier': None
-            }
-        else:
-            package_status[package['id']] = {
-                'status': 'not_arrived',
-                'location': None,
-                'position': None,
-                'carrier': None
-            }
-    
-    # Update statuses based on actions up to the given time
-    for action in output_data:
-        if action['time'] > time:
-            break
-            
-        courier_id = action['courier']
+    # Bind everything the update reads, so frames don't look it up again
+    courier_scatter, package_scatter = artists['couriers'], artists['packages']
+    time_text, delivered_text = artists['time'], artists['delivered']
+    courier_labels = list(zip(artists['courier_labels'], artists['courier_package_labels']))
+    package_labels = artists['package_labels']
+    courier_xy_by_time, courier_action_by_time = timeline['courier_xy'], timeline['courier_action']
+    courier_packages_by_time = timeline['courier_packages']
+    package_xy_by_time, package_status_by_time = timeline['package_xy'], timeline['package_status']
+    package_carrier_by_time, state_id_by_time = timeline['package_carrier'], timeline['state_id']
+    not_arrived, delivered = PACKAGE_STATUS_CODES['not_arrived'], PACKAGE_STATUS_CODES['delivered']
+    num_packages = len(timeline['package_ids'])
+    animated_artists = [courier_scatter, package_scatter, time_text, delivered_text,
+                        *artists['courier_labels'], *artists['courier_package_labels'], *package_labels]
+    shown_state_id = None
+    
+    def update(time):
+        nonlocal shown_state_id
+        
+        # Quiet stretches share one state, so only the time readout needs to change
+        time_text.set_text(f'Time: {time}')
+        if state_id_by_time[time] == shown_state_id:
+            return animated_artists
+        shown_state_id = state_id_by_time[time]
         
-        if action['action'] == 'pick_up':
-            for package_id in action['packages']:
-                if package_id in package_status:
-                    package_status[package_id]['status'] = 'with_courier'
-                    package_status[package_id]['location'] = action['location']
-                    package_status[package_id]['position'] = get_location_by_id(input_data, action['location'])['coordinates']
-                    package_status[package_id]['carrier'] = courier_id
+        courier_xy = courier_xy_by_time[time]
+        courier_packages = courier_packages_by_time[time]
+        package_xy = package_xy_by_time[time]
+        package_status = package_status_by_time[time]
+        
+        # Update couriers, colored by their current action
+        courier_scatter.set_offsets(courier_xy)
+        courier_scatter.set_facecolors(COURIER_ACTION_RGBA[courier_action_by_time[time]])
+        for (label, package_label), (x, y), packages in zip(courier_labels, courier_xy, courier_packages):
+            label.set_position((x, y + 0.2))
+            label.set_visible(True)
+            
+            # Show packages carried
+            if packages:
+                package_label.set_position((x, y - 0.2))
+                package_label.set_text(packages)
+                package_label.set_visible(True)
+            else:
+                package_label.set_visible(False)
         
-        elif action['action'] == 'drop_off':
-            for package_id in action['packages']:
-                if package_id in package_status:
-                    package_status[package_id]['status'] = 'at_package_point'
-                    package_status[package_id]['location'] = action['location']
-                    package_status[package_id]['position'] = get_location_by_id(input_data, action['location'])['coordinates']
-                    package_status[package_id]['carrier'] = None
+        # Update packages lying at a warehouse or package point: hide packages that
+        # haven't arrived yet, delivered packages and packages carried by couriers
+        visible = (package_status != not_arrived) & (package_status != delivered) & (package_carrier_by_time[time] < 0)
+        package_scatter.set_offsets(package_xy[visible])
+        package_scatter.set_facecolors(PACKAGE_STATUS_RGBA[package_status[visible]])
+        for label, xy, shown in zip(package_labels, package_xy, visible):
+            if shown:
+                label.set_position(xy)
+            label.set_visible(shown)
         
-        elif action['action'] == 'deliver':
-            for package_id in action['packages']:
-                if package_id in package_status:
-                    package_status[package_id]['status'] = 'delivered'
-                    package_status[package_id]['location'] = action['location']
-                    package_status[package_id]['position'] = get_location_by_id(input_data, action['location'])['coordinates']
-                    package_status[package_id]['carrier'] = None
+        # Update delivery status
+        delivered_text.set_text(f'Delivered: {np.count_nonzero(package_status == delivered)}/{num_packages}')
+        return animated_artists
+    
+    return update
+
+
+# Figure state of the current frame-rendering process, set up by _init_render_worker
+_render_state = {}
+
+
+def _init_render_worker(input_data: Dict[str, Any], timeline: Dict[str, Any]):
+    """Rasterize the static map once in this process so each frame only draws the dynamic artists."""
+    # An off-screen Agg canvas; the full draw leaves out the animated artists
+    fig = Figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    artists = init_plot(ax, input_data, timeline['courier_ids'], timeline['package_ids'])
+    fig.canvas.draw()
+    
+    # Dynamic artists are drawn over the cached background in the order a full draw would use
+    animated_artists = sorted((artist for artist in ax.get_children() if artist.get_animated()),
+                              key=lambda artist: artist.get_zorder())
+    _render_state.update(fig=fig, ax=ax, update=make_updater(artists, timeline), animated_artists=animated_artists,
+                         background=fig.canvas.copy_from_bbox(fig.bbox))
+
+
+def _render_frame(time: int) -> np.ndarray:
+    """Render the frame for the given time and return it as an RGBA array."""
+    fig, ax = _render_state['fig'], _render_state['ax']
+    _render_state['update'](time)
+    fig.canvas.restore_region(_render_state['background'])
+    for artist in _render_state['animated_artists']:
+        ax.draw_artist(artist)
+    return np.array(fig.canvas.buffer_rgba())
+
+
+def render_frames(input_data: Dict[str, Any], timeline: Dict[str, Any], frames, workers: int = 1):
+    """
+    Render the given frames, in order, spreading the work over several processes.
+    
+    Args:
+        input_data: Dictionary containing the problem data
+        timeline: Per-time state returned by precompute_timeline
+        frames: Times to render
+        workers: Number of rendering processes (1 renders in this process)
         
-        elif action['action'] == 'move':
-            # Update positions of packages carried by the courier
-            for package_id in action['packages']:
-                if package_id in package_status and package_status[package_id]['carrier'] == courier_id:
-                    package_status[package_id]['status'] = 'with_courier'
-                    package_status[package_id]['location'] = None
-                    package_status[package_id]['position'] = action['to']
+    Yields:
+        RGBA array of each frame
+    """
+    frames = list(frames)
+    workers = max(1, min(workers, len(frames)))
     
-    return package_status
+    if workers == 1:
+        _init_render_worker(input_data, timeline)
+        try:
+            for time in frames:
+                yield _render_frame(time)
+        finally:
+            # Release the figure and cached background once saving is done
+            _render_state.clear()
+        return
+    
+    # The problem data and timeline are sent to each worker once, not with every frame
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                             initargs=(input_data, timeline)) as executor:
+        yield from executor.map(_render_frame, frames, chunksize=max(1, len(frames) // (workers * 4)))
 
 
-def create_animation(input_data: Dict[str, Any], output_data: List[Dict[str, Any]], save_path: str = None):
+def save_animation(frames, save_path: str, fps: int = 2):
+    """
+    Write rendered frames to a GIF or video file.
+    
+    GIFs are assembled by Pillow straight from the RGBA frames; any other
+    extension is encoded by ffmpeg from the raw frames piped to it.
+    
+    Args:
+        frames: Iterable of RGBA arrays, all of the same size
+        save_path: Path to save the animation to
+        fps: Frames per second of the output
+    """
+    if os.path.splitext(save_path)[1].lower() == '.gif':
+        images = [Image.fromarray(frame).convert('RGB') for frame in frames]
+        images[0].save(save_path, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0)
+        return
+    
+    if not animation.FFMpegWriter.isAvailable():
+        print(f"Error: Saving '{save_path}' requires ffmpeg; use a .gif file instead.")
+        sys.exit(1)
+    
+    ffmpeg = None
+    try:
+        for frame in frames:
+            if ffmpeg is None:
+                height, width = frame.shape[:2]
+                ffmpeg = subprocess.Popen(
+                    [matplotlib.rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                     '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{width}x{height}', '-r', str(fps), '-i', 'pipe:',
+                     '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', save_path],
+                    stdin=subprocess.PIPE)
+            ffmpeg.stdin.write(frame.tobytes())
+    finally:
+        if ffmpeg is not None:
+            ffmpeg.stdin.close()
+            ffmpeg.wait()
+
+
+def create_animation(input_data: Dict[str, Any], output_data: List[Dict[str, Any]], save_path: str = None,
+                     workers: int = 1, frame_step: int = 1, skip_idle: bool = False):
     """
     Create an animation of the solution.
     
@@ -198,150 +540,39 @@ def create_animation(input_data: Dict[str, Any], output_data: List[Dict[str, Any
         input_data: Dictionary containing the problem data
         output_data: List of actions from the solution
         save_path: Path to save the animation (if None, display instead)
+        workers: Number of processes rendering frames when saving
+        frame_step: Show only every frame_step-th time step
+        skip_idle: Leave out time steps at which nothing changes
     """
-    # Get map dimensions
-    map_width, map_height = input_data['map']['dimensions']
-    
     # Get max time from output data
-    max_time = max(action['time'] for action in output_data) + 1
+    times = np.fromiter((action['time'] for action in output_data), dtype=np.int64, count=len(output_data))
+    max_time = int(times.max()) + 1
     
-    # Create figure and axis
-    fig, ax = plt.subplots(figsize=(12, 10))
+    # Index locations once so lookups during the replay are constant time
+    location_by_id = {location['id']: location for location in input_data['map']['locations']}
+    coords_by_id = {location_id: np.asarray(location['coordinates'], dtype=np.float32)
+                    for location_id, location in location_by_id.items()}
     
-    # Function to draw a single frame
-    def draw_frame(time):
-        ax.clear()
-        
-        # Set up the grid
-        ax.set_xlim(-0.5, map_width - 0.5)
-        ax.set_ylim(-0.5, map_height - 0.5)
-        ax.grid(True, linestyle='--', alpha=0.7)
-        
-        # Set integer ticks
-        ax.set_xticks(range(map_width))
-        ax.set_yticks(range(map_height))
-        
-        # Plot locations
-        warehouse_xs, warehouse_ys = [], []
-        package_point_xs, package_point_ys = [], []
-        destination_xs, destination_ys = [], []
-        package_point_capacities = []
-        location_coords = {}
-        
-        for location in input_data['map']['locations']:
-            x, y = location['coordinates']
-            location_coords[location['id']] = (x, y)
-            
-            if location['type'] == 'warehouse':
-                warehouse_xs.append(x)
-                warehouse_ys.append(y)
-                ax.text(x, y + 0.3, location['id'], fontsize=10, ha='center')
-            elif location['type'] == 'package_point':
-                package_point_xs.append(x)
-                package_point_ys.append(y)
-                package_point_capacities.append(location['capacity'])
-                ax.text(x, y + 0.3, f"{location['id']} (Cap: {location['capacity']})", fontsize=10, ha='center')
-            elif location['type'] == 'destination':
-                destination_xs.append(x)
-                destination_ys.append(y)
-                ax.text(x, y + 0.3, location['id'], fontsize=10, ha='center')
-        
-        # Plot warehouses (blue squares)
-        ax.scatter(warehouse_xs, warehouse_ys, color='skyblue', s=200, marker='s', edgecolors='black', zorder=10)
-        
-        # Plot package points (green circles with size based on capacity)
-        sizes = [100 + cap * 30 for cap in package_point_capacities]
-        ax.scatter(package_point_xs, package_point_ys, color='lightgreen', s=sizes, edgecolors='black', zorder=10)
-        
-        # Plot destinations (red triangles)
-        ax.scatter(destination_xs, destination_ys, color='salmon', s=200, marker='^', edgecolors='black', zorder=10)
-        
-        # Get courier positions and package statuses for this time
-        courier_positions = get_courier_positions(input_data, output_data, time)
-        package_status = get_package_status(input_data, output_data, time)
-        
-        # Plot couriers
-        for courier_id, courier_info in courier_positions.items():
-            x, y = courier_info['position']
-            packages = courier_info['packages']
-            action = courier_info['action']
-            
-            # Different colors for different actions
-            color = 'purple'  # default
-            if action == 'pick_up':
-                color = 'green'
-            elif action == 'drop_off':
-                color = 'orange'
-            elif action == 'deliver':
-                color = 'red'
-            
-            ax.scatter(x, y, color=color, s=150, marker='s', edgecolors='black', zorder=15)
-            ax.text(x, y + 0.2, courier_id, fontsize=8, ha='center')
-            
-            # Show packages carried
-            if packages:
-                ax.text(x, y - 0.2, f"{', '.join(packages)}", fontsize=7, ha='center',
-                       bbox=dict(facecolor='white', alpha=0.7, edgecolor='none'))
-        
-        # Plot packages
-        for package_id, status in package_status.items():
-            if status['status'] == 'not_arrived':
-                continue  # Don't show packages that haven't arrived yet
-                
-            if status['status'] == 'delivered':
-                continue  # Don't show delivered packages
-                
-            if status['position']:
-                x, y = status['position']
-                
-                # Different colors for different statuses
-                color = 'yellow'  # default
-                if status['status'] == 'at_warehouse':
-                    color = 'blue'
-                elif status['status'] == 'at_package_point':
-                    color = 'green'
-                
-                # Only show packages not carried by couriers
-                if status['carrier'] is None:
-                    ax.scatter(x, y, color=color, s=80, marker='o', edgecolors='black', alpha=0.7, zorder=12)
-                    ax.text(x, y, package_id, fontsize=6, ha='center', va='center')
-        
-        # Set title with current time
-        ax.set_title(f'Package Delivery Solution - Time: {time}')
-        
-        # Add legend
-        legend_elements = [
-            mpatches.Patch(color='skyblue', label='Warehouse'),
-            mpatches.Patch(color='lightgreen', label='Package Point'),
-            mpatches.Patch(color='salmon', label='Destination'),
-            Line2D([0], [0], marker='s', color='w', markerfacecolor='purple', markersize=10, label='Courier (Moving/Waiting)'),
-            Line2D([0], [0], marker='s', color='w', markerfacecolor='green', markersize=10, label='Courier (Picking Up)'),
-            Line2D([0], [0], marker='s', color='w', markerfacecolor='orange', markersize=10, label='Courier (Dropping Off)'),
-            Line2D([0], [0], marker='s', color='w', markerfacecolor='red', markersize=10, label='Courier (Delivering)'),
-            Line2D([0], [0], marker='o', color='w', markerfacecolor='blue', markersize=8, label='Package at Warehouse'),
-            Line2D([0], [0], marker='o', color='w', markerfacecolor='green', markersize=8, label='Package at Package Point')
-        ]
-        ax.legend(handles=legend_elements, loc='upper right', fontsize='small')
-        
-        # Add delivery status
-        delivered_count = sum(1 for status in package_status.values() if status['status'] == 'delivered')
-        total_packages = len(package_status)
-        ax.text(0.02, 0.02, f'Delivered: {delivered_count}/{total_packages}', 
-                transform=ax.transAxes, fontsize=12, 
-                bbox=dict(facecolor='white', alpha=0.7, edgecolor='black'))
-        
-        return []
-    
-    # Create animation
-    ani = animation.FuncAnimation(fig, draw_frame, frames=range(max_time), interval=500, blit=True)
+    # Replay the solution once up front; frames then only index into it
+    timeline = precompute_timeline(input_data, output_data, max_time, coords_by_id, times)
+    frames = select_frames(timeline, max_time, frame_step, skip_idle)
     
     # Save or display
     if save_path:
-        ani.save(save_path, writer='pillow', fps=2)
+        save_animation(render_frames(input_data, timeline, frames, workers), save_path)
         print(f"Animation saved to {save_path}")
-    else:
-        plt.tight_layout()
-        plt.show()
+        return
+    
+    # Create figure and axis, drawing everything static exactly once
+    fig, ax = plt.subplots(figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
+    artists = init_plot(ax, input_data, timeline['courier_ids'], timeline['package_ids'])
+    draw_frame = make_updater(artists, timeline)
+    
+    # Frames are cheap to redraw from the timeline, so don't keep them around for replays
+    ani = animation.FuncAnimation(fig, draw_frame, frames=frames, interval=500, blit=True, cache_frame_data=False)
+    plt.tight_layout()
+    plt.show()
+    plt.close(fig)
 
 
 def main():
@@ -350,13 +581,21 @@ def main():
     parser.add_argument('input_file', help='Path to the input JSON file')
     parser.add_argument('output_file', help='Path to the output JSON file (solution)')
     parser.add_argument('--save', help='Path to save the animation (e.g., solution.gif)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of processes rendering frames when saving (default: number of CPUs)')
+    parser.add_argument('--frame-step', type=int, default=1,
+                        help='Show only every N-th time step (default: 1)')
+    parser.add_argument('--skip-idle', action='store_true',
+                        help='Leave out time steps at which no courier or package changes')
     
     args = parser.parse_args()
+    if args.frame_step < 1:
+        parser.error('--frame-step must be at least 1')
     
     input_data = load_json_data(args.input_file)
     output_data = load_json_data(args.output_file)
     
-    create_animation(input_data, output_data, args.save)
+    create_animation(input_data, output_data, args.save, args.workers, args.frame_step, args.skip_idle)
 
 
 if __name__ == "__main__":
@@ -6,11 +6,12 @@ This script validates and scores a solution for the Package Delivery Algorithm C
 It checks if the solution is valid and calculates a score based on delivery time and penalties.
 
 Usage:
-    python validator.py input_file output_file
+    python validator.py input_file output_file [--quick]
 
 Args:
     input_file: Path to the input JSON file containing the problem definition
     output_file: Path to the output JSON file containing the solution to validate
+    --quick: Stop at the first error and only report validity through the exit code
 
 Returns:
     A score for the solution (lower is better)
@@ -19,10 +20,25 @@ Returns:
 
 import json
 import sys
-import math
+from operator import itemgetter
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from typing import Dict, List, Any, Tuple, Set
 
 
+class PackageState:
+    """Mutable tracking state for a single package."""
+    __slots__ = ("status", "location", "arrival_time", "delivery_time")
+    
+    def __init__(self, status: str, location: str, arrival_time: int, delivery_time: int = None):
+        self.status = status
+        self.location = location
+        self.arrival_time = arrival_time
+        self.delivery_time = delivery_time
+
+
 class Validator:
     def __init__(self, input_file: str, output_file: str):
         """
@@ -37,6 +53,8 @@ class Validator:
         self.input_data = None
         self.output_data = None
         self.locations = {}
+        self.location_coordinates = {}
+        self.location_types = {}
         self.couriers = {}
         self.packages = {}
         self.errors = []
@@ -61,12 +79,13 @@ class Validator:
         Returns:
             bool: True if loading was successful, False otherwise
         """
+        loads = orjson.loads if orjson is not None else json.loads
         try:
-            with open(self.input_file, 'r') as f:
-                self.input_data = json.load(f)
+            with open(self.input_file, 'rb') as f:
+                self.input_data = loads(f.read())
                 
-            with open(self.output_file, 'r') as f:
-                self.output_data = json.load(f)
+            with open(self.output_file, 'rb') as f:
+                self.output_data = loads(f.read())
                 
             return True
         except Exception as e:
@@ -78,6 +97,8 @@ class Validator:
         # Process locations
         for location in self.input_data["map"]["locations"]:
             self.locations[location["id"]] = location
+            self.location_coordinates.setdefault(location["id"], location["coordinates"])
+            self.location_types[location["id"]] = location["type"]
             if location["type"] == "package_point":
                 self.package_point_contents[location["id"]] = []
         
@@ -91,41 +112,44 @@ class Validator:
             start_coords = self._get_location_coordinates(start_loc)
             self.courier_positions[courier_id] = start_coords
             
-            # Initialize empty package list for each courier
-            self.courier_packages[courier_id] = []
+            # Initialize empty package set for each courier
+            self.courier_packages[courier_id] = set()
         
         # Process packages
         for package in self.input_data["packages"]:
             package_id = package["id"]
             self.packages[package_id] = package
-            self.package_status[package_id] = {
-                "status": "at_warehouse",
-                "location": package["origin"],
-                "arrival_time": package["arrival_time"],
-                "delivery_time": None
-            }
+            self.package_status[package_id] = PackageState(
+                "at_warehouse", package["origin"], package["arrival_time"]
+            )
     
     def _get_location_coordinates(self, location_id: str) -> List[int]:
         """Get coordinates for a location by its ID."""
-        for loc in self.input_data["map"]["locations"]:
-            if loc["id"] == location_id:
-                return loc["coordinates"]
-        return None
+        return self.location_coordinates.get(location_id)
     
-    def _calculate_distance(self, point1: List[int], point2: List[int]) -> float:
-        """Calculate the Euclidean distance between two points."""
-        return math.sqrt((point2[0] - point1[0])**2 + (point2[1] - point1[1])**2)
-    
-    def _is_valid_move(self, from_pos: List[int], to_pos: List[int]) -> bool:
-        """Check if a move is valid (one cell horizontally, vertically, or diagonally)."""
-        dx = abs(to_pos[0] - from_pos[0])
-        dy = abs(to_pos[1] - from_pos[1])
-        return dx <= 1 and dy <= 1 and (dx > 0 or dy > 0)
+    def _require_courier_at(self, courier_id: str, location_id: str) -> bool:
+        """Check that a location exists and the courier is at it, recording an error if not."""
+        location_pos = self._get_location_coordinates(location_id)
+        
+        if not location_pos:
+            self.errors.append(f"Invalid location ID: {location_id}")
+            self.invalid_action_penalty += 10
+            return False
+            
+        if self.courier_positions[courier_id] != location_pos:
+            self.errors.append(f"Courier {courier_id} is not at location {location_id}")
+            self.invalid_action_penalty += 10
+            return False
+            
+        return True
     
-    def validate_solution(self) -> bool:
+    def validate_solution(self, stop_on_error: bool = False) -> bool:
         """
         Validate the solution and calculate the score.
         
+        Args:
+            stop_on_error: Stop processing actions at the first recorded error
+            
         Returns:
             bool: True if validation was successful, False otherwise
         """
@@ -134,56 +158,88 @@ class Validator:
             
         self.initialize_tracking()
         
+        # Check the solution shape and action times once up front so the time sort can't fail
+        if isinstance(self.output_data, list):
+            actions = self.output_data
+        else:
+            self.errors.append("Solution must be a list of actions")
+            actions = []
+            
+        timed_actions = [action_data for action_data in actions
+                         if isinstance(action_data, dict) and type(action_data.get("time")) in (int, float)]
+        if len(timed_actions) != len(actions):
+            for action_data in actions:
+                if not isinstance(action_data, dict):
+                    self.errors.append(f"Invalid action: {action_data}")
+                    self.invalid_action_penalty += 10
+                elif "time" not in action_data:
+                    self.errors.append("Missing required field in action: 'time'")
+                    self.invalid_action_penalty += 10
+                elif type(action_data["time"]) not in (int, float):
+                    self.errors.append(f"Invalid time in action: {action_data['time']}")
+                    self.invalid_action_penalty += 10
+        
         # Sort actions by time
-        sorted_actions = sorted(self.output_data, key=lambda x: x["time"])
+        sorted_actions = sorted(timed_actions, key=itemgetter("time"))
+        
+        # Action handlers by action type
+        dispatch = {
+            "pick_up": self._process_pickup,
+            "drop_off": self._process_dropoff,
+            "deliver": self._process_deliver,
+            "move": self._process_move,
+            "wait": self._process_wait
+        }
+        
+        # Bind hot attributes to locals for the main loop
+        couriers = self.couriers
+        errors = self.errors
+        completion_time = self.completion_time
+        penalty = 0
         
         # Process each action
         for action_data in sorted_actions:
+            if stop_on_error and errors:
+                return False
+                
             try:
                 time = action_data["time"]
                 courier_id = action_data["courier"]
                 action_type = action_data["action"]
                 
                 # Update completion time
-                if time > self.completion_time:
-                    self.completion_time = time
+                if time > completion_time:
+                    completion_time = time
                 
                 # Check if courier exists
-                if courier_id not in self.couriers:
-                    self.errors.append(f"Invalid courier ID: {courier_id}")
-                    self.invalid_action_penalty += 10
+                if courier_id not in couriers:
+                    errors.append(f"Invalid courier ID: {courier_id}")
+                    penalty += 10
                     continue
                     
                 # Process action based on type
-                if action_type == "pick_up":
-                    self._process_pickup(action_data, time)
-                elif action_type == "drop_off":
-                    self._process_dropoff(action_data, time)
-                elif action_type == "deliver":
-                    self._process_deliver(action_data, time)
-                elif action_type == "move":
-                    self._process_move(action_data, time)
-                elif action_type == "wait":
-                    # Wait action is always valid as long as location is valid
-                    location_id = action_data.get("location", None)
-                    if location_id and location_id not in self.locations:
-                        self.errors.append(f"Invalid location ID for wait action: {location_id}")
-                        self.invalid_action_penalty += 10
+                handler = dispatch.get(action_type)
+                if handler is None:
+                    errors.append(f"Invalid action type: {action_type}")
+                    penalty += 10
                 else:
-                    self.errors.append(f"Invalid action type: {action_type}")
-                    self.invalid_action_penalty += 10
+                    handler(action_data, time)
             except KeyError as e:
-                self.errors.append(f"Missing required field in action: {str(e)}")
-                self.invalid_action_penalty += 10
+                errors.append(f"Missing required field in action: {str(e)}")
+                penalty += 10
             except Exception as e:
-                self.errors.append(f"Error processing action: {str(e)}")
-                self.invalid_action_penalty += 10
+                errors.append(f"Error processing action: {str(e)}")
+                penalty += 10
         
-        # Check for undelivered packages
-        undelivered = set(self.packages.keys()) - self.delivered_packages
-        self.undelivered_penalty = len(undelivered) * 100
+        self.completion_time = completion_time
+        self.invalid_action_penalty += penalty
         
-        if undelivered:
+        # Check for undelivered packages, only building the set when some are missing
+        undelivered_count = len(self.packages) - len(self.delivered_packages)
+        self.undelivered_penalty = undelivered_count * 100
+        
+        if undelivered_count:
+            undelivered = set(self.packages.keys()) - self.delivered_packages
             self.errors.append(f"Undelivered packages: {', '.join(undelivered)}")
         
         return len(self.errors) == 0
@@ -195,22 +251,11 @@ class Validator:
         packages = action_data.get("packages", [])
         
         # Check if courier is at the location
-        courier_pos = self.courier_positions[courier_id]
-        location_pos = self._get_location_coordinates(location_id)
-        
-        if not location_pos:
-            self.errors.append(f"Invalid location ID: {location_id}")
-            self.invalid_action_penalty += 10
-            return
-            
-        if courier_pos != location_pos:
-            self.errors.append(f"Courier {courier_id} is not at location {location_id}")
-            self.invalid_action_penalty += 10
+        if not self._require_courier_at(courier_id, location_id):
             return
             
         # Check if location is a warehouse
-        location = self.locations[location_id]
-        if location["type"] != "warehouse":
+        if self.location_types[location_id] != "warehouse":
             self.errors.append(f"Cannot pick up from non-warehouse location: {location_id}")
             self.invalid_action_penalty += 10
             return
@@ -239,7 +284,7 @@ class Validator:
                 self.invalid_action_penalty += 10
                 continue
                 
-            if package_status["status"] != "at_warehouse":
+            if package_status.status != "at_warehouse":
                 self.errors.append(f"Package {package_id} is not at warehouse")
                 self.invalid_action_penalty += 10
                 continue
@@ -250,11 +295,11 @@ class Validator:
                 continue
                 
             # Update package status
-            package_status["status"] = "with_courier"
-            package_status["location"] = courier_id
+            package_status.status = "with_courier"
+            package_status.location = courier_id
             
             # Add package to courier
-            self.courier_packages[courier_id].append(package_id)
+            self.courier_packages[courier_id].add(package_id)
     
     def _process_dropoff(self, action_data: Dict[str, Any], time: int):
         """Process a drop_off action."""
@@ -263,27 +308,17 @@ class Validator:
         packages = action_data.get("packages", [])
         
         # Check if courier is at the location
-        courier_pos = self.courier_positions[courier_id]
-        location_pos = self._get_location_coordinates(location_id)
-        
-        if not location_pos:
-            self.errors.append(f"Invalid location ID: {location_id}")
-            self.invalid_action_penalty += 10
-            return
-            
-        if courier_pos != location_pos:
-            self.errors.append(f"Courier {courier_id} is not at location {location_id}")
-            self.invalid_action_penalty += 10
+        if not self._require_courier_at(courier_id, location_id):
             return
             
         # Check if location is a package point
-        location = self.locations[location_id]
-        if location["type"] != "package_point":
+        if self.location_types[location_id] != "package_point":
             self.errors.append(f"Cannot drop off at non-package-point location: {location_id}")
             self.invalid_action_penalty += 10
             return
             
         # Check package point capacity
+        location = self.locations[location_id]
         current_pp_packages = self.package_point_contents[location_id]
         if len(current_pp_packages) + len(packages) > location["capacity"]:
             self.errors.append(f"Exceeding package point capacity for {location_id}")
@@ -299,11 +334,12 @@ class Validator:
                 continue
                 
             # Update package status
-            self.package_status[package_id]["status"] = "at_package_point"
-            self.package_status[package_id]["location"] = location_id
+            package_status = self.package_status[package_id]
+            package_status.status = "at_package_point"
+            package_status.location = location_id
             
             # Remove package from courier
-            self.courier_packages[courier_id].remove(package_id)
+            current_packages.remove(package_id)
             
             # Add package to package point
             self.package_point_contents[location_id].append(package_id)
@@ -315,22 +351,11 @@ class Validator:
         packages = action_data.get("packages", [])
         
         # Check if courier is at the location
-        courier_pos = self.courier_positions[courier_id]
-        location_pos = self._get_location_coordinates(location_id)
-        
-        if not location_pos:
-            self.errors.append(f"Invalid location ID: {location_id}")
-            self.invalid_action_penalty += 10
-            return
-            
-        if courier_pos != location_pos:
-            self.errors.append(f"Courier {courier_id} is not at location {location_id}")
-            self.invalid_action_penalty += 10
+        if not self._require_courier_at(courier_id, location_id):
             return
             
         # Check if location is a destination
-        location = self.locations[location_id]
-        if location["type"] != "destination":
+        if self.location_types[location_id] != "destination":
             self.errors.append(f"Cannot deliver to non-destination location: {location_id}")
             self.invalid_action_penalty += 10
             return
@@ -350,12 +375,13 @@ class Validator:
                 continue
                 
             # Update package status
-            self.package_status[package_id]["status"] = "delivered"
-            self.package_status[package_id]["location"] = location_id
-            self.package_status[package_id]["delivery_time"] = time
+            package_status = self.package_status[package_id]
+            package_status.status = "delivered"
+            package_status.location = location_id
+            package_status.delivery_time = time
             
             # Remove package from courier
-            self.courier_packages[courier_id].remove(package_id)
+            current_packages.remove(package_id)
             
             # Mark package as delivered
             self.delivered_packages.add(package_id)
@@ -375,14 +401,16 @@ class Validator:
             return
             
         # Check if move is valid (one cell horizontally, vertically, or diagonally)
-        if not self._is_valid_move(from_pos, to_pos):
+        dx = to_pos[0] - from_pos[0]
+        dy = to_pos[1] - from_pos[1]
+        if not (-1 <= dx <= 1 and -1 <= dy <= 1 and (dx != 0 or dy != 0)):
             self.errors.append(f"Invalid move from {from_pos} to {to_pos}")
             self.invalid_action_penalty += 10
             return
             
         # Check if packages match what courier is carrying
         current_packages = self.courier_packages[courier_id]
-        if set(packages) != set(current_packages):
+        if set(packages) != current_packages:
             self.errors.append(f"Packages in move action don't match what courier {courier_id} is carrying")
             self.invalid_action_penalty += 10
             return
@@ -390,6 +418,14 @@ class Validator:
         # Update courier position
         self.courier_positions[courier_id] = to_pos
     
+    def _process_wait(self, action_data: Dict[str, Any], time: int):
+        """Process a wait action."""
+        # Wait action is always valid as long as location is valid
+        location_id = action_data.get("location", None)
+        if location_id and location_id not in self.locations:
+            self.errors.append(f"Invalid location ID for wait action: {location_id}")
+            self.invalid_action_penalty += 10
+    
     def calculate_score(self) -> Dict[str, Any]:
         """
         Calculate the final score for the solution.
@@ -424,20 +460,49 @@ class Validator:
         score_data = self.calculate_score()
         
         return score_data
+    
+    def fast_is_valid(self) -> bool:
+        """
+        Check whether the solution is valid without building a full report.
+        
+        Validation stops at the first error, so the errors list and score
+        components are incomplete when the solution is invalid.
+        
+        Returns:
+            bool: True if the solution is valid, False otherwise
+        """
+        return self.validate_solution(stop_on_error=True)
 
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python validator.py input_file output_file")
+    args = sys.argv[1:]
+    quick = "--quick" in args
+    if quick:
+        args.remove("--quick")
+        
+    if len(args) != 2:
+        print("Usage: python validator.py input_file output_file [--quick]")
         sys.exit(1)
         
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
+    input_file = args[0]
+    output_file = args[1]
     
     validator = Validator(input_file, output_file)
+    
+    # Only report validity through the exit code
+    if quick:
+        is_valid = validator.fast_is_valid()
+        print("valid" if is_valid else "invalid")
+        sys.exit(0 if is_valid else 1)
+        
     result = validator.validate_and_score()
     
-    print(json.dumps(result, indent=2))
+    # Serialize with orjson when available
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2) + b"\n")
+        sys.stdout.flush()
+    else:
+        print(json.dumps(result, indent=2))
     
     # Return exit code based on validation result
     if not result["is_valid"]: